@@ -0,0 +1,58 @@
+"""
+Gzip compression benchmark
+
+Bandwidth vs CPU tradeoff of gzip levels on a GET /spendings/{user_id}
+style JSON payload, to pick GZIP_COMPRESSLEVEL / GZIP_MINIMUM_SIZE.
+
+For each payload size and level it reports the compressed size, the
+compression ratio and the compression time / throughput.
+
+Run from the project root:
+
+    python -m benchmarks.bench_gzip
+"""
+
+import gzip
+import json
+import random
+import time
+
+ROW_COUNTS = (10, 1_000, 100_000)
+LEVELS = (1, 3, 6, 9)
+REPEAT = 5
+
+
+def make_payload(rows: int) -> bytes:
+    rng = random.Random(42)
+    spendings = [
+        {
+            "transaction_id": i + 1,
+            "user_id": 1,
+            "merchant_id": rng.randint(1, 3),
+            "amount": 3 + rng.gammavariate(1.5, 2.0) * 5,  # chi-square(3), as in seed_data
+        }
+        for i in range(rows)
+    ]
+    # Same separators as Starlette's JSONResponse
+    return json.dumps(spendings, separators=(",", ":")).encode()
+
+
+def measure(body: bytes, level: int) -> tuple[int, float]:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        compressed = gzip.compress(body, compresslevel=level)
+        best = min(best, time.perf_counter() - start)
+    return len(compressed), best
+
+
+if __name__ == "__main__":
+    print(f"{'rows':>8} {'raw':>10} {'level':>5} {'gzip':>10} {'ratio':>6} {'time':>9} {'MB/s':>7}")
+    for rows in ROW_COUNTS:
+        body = make_payload(rows)
+        for level in LEVELS:
+            size, elapsed = measure(body, level)
+            print(
+                f"{rows:>8} {len(body):>10} {level:>5} {size:>10} "
+                f"{len(body) / size:>6.1f} {elapsed * 1000:>7.2f}ms {len(body) / elapsed / 2**20:>7.1f}"
+            )
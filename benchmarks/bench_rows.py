@@ -0,0 +1,92 @@
+"""
+Row representation microbenchmark
+
+Compares, per 100k spendings rows, the old GET /spendings/{user_id} path:
+
+    sqlite3.Row -> dict -> SpendingOut -> jsonable_encoder -> json
+
+with the current one:
+
+    spending_row_factory -> SpendingRecord -> _asdict -> json
+
+and reports wall time plus peak allocated memory (tracemalloc).
+
+Run from the project root:
+
+    python -m benchmarks.bench_rows
+"""
+
+import json
+import sqlite3
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+
+from data import spending_row_factory
+from models.spending_model import SpendingOut
+
+ROWS = 100_000
+QUERY = "SELECT transaction_id, user_id, merchant_id, amount FROM spendings WHERE user_id = ?"
+
+
+def make_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE spendings (
+            transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            merchant_id INTEGER NOT NULL,
+            amount REAL NOT NULL
+        );
+    """)
+    conn.executemany(
+        "INSERT INTO spendings (user_id, merchant_id, amount) VALUES (?, ?, ?)",
+        ((1, i % 3 + 1, 3.0 + (i % 97) * 0.25) for i in range(ROWS)),
+    )
+    conn.commit()
+    return conn
+
+
+def pydantic_path(conn: sqlite3.Connection) -> str:
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    rows = cursor.execute(QUERY, (1,)).fetchall()
+    models = [SpendingOut(**dict(row)) for row in rows]
+    return json.dumps(jsonable_encoder(models))
+
+
+def record_path(conn: sqlite3.Connection) -> str:
+    cursor = conn.cursor()
+    cursor.row_factory = spending_row_factory
+    rows = cursor.execute(QUERY, (1,)).fetchall()
+    return json.dumps([row._asdict() for row in rows])
+
+
+def measure(fn, conn: sqlite3.Connection) -> tuple[float, int]:
+    fn(conn)  # warm-up
+
+    start = time.perf_counter()
+    fn(conn)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn(conn)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    conn = make_db()
+    results = {
+        "sqlite3.Row + SpendingOut": measure(pydantic_path, conn),
+        "SpendingRecord": measure(record_path, conn),
+    }
+
+    print(f"{ROWS} rows")
+    for name, (elapsed, peak) in results.items():
+        print(f"{name:<28} {elapsed * 1000:8.1f} ms   peak {peak / 2**20:7.1f} MiB")
+
+    (old_t, old_m), (new_t, new_m) = results.values()
+    print(f"speedup x{old_t / new_t:.1f}, peak memory -{(1 - new_m / old_m) * 100:.0f}%")
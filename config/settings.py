@@ -1,5 +1,6 @@
 # config/settings.py
 
+from pydantic import Field
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -13,9 +14,39 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///data/spendings.db"
 
+    # HTTP caching: ETags on read endpoints (see data/versions.py)
+    etag_caching: bool = True
+
+    # Background precomputation (see services/scheduler.py)
+    precompute_enabled: bool = True
+    precompute_interval: float = 1.0       # seconds between worker runs
+    precompute_max_staleness: float = 5.0  # seconds a stale result may still be served
+    precompute_cache_size: int = Field(10_000, gt=0)  # cached results, least recently used dropped first
+
+    # Response compression (see middleware/compression.py)
+    gzip_compression: bool = True
+    gzip_minimum_size: int = 1024  # bytes; smaller bodies are sent as is
+    gzip_compresslevel: int = 6    # 1 (fastest) .. 9 (smallest)
+
+    # Admission control (see middleware/admission.py)
+    admission_control: bool = True
+    write_concurrency_limit: int = Field(8, gt=0)
+    read_concurrency_limit: int = Field(32, gt=0)
+    recommendation_concurrency_limit: int = Field(8, gt=0)
+    admission_queue_size: int = Field(64, ge=0)         # waiting requests per route group (0 = no queue)
+    admission_queue_timeout: float = Field(1.0, gt=0)   # seconds before a queued request gets 503
+    rate_limit_per_second: float = Field(20.0, gt=0)    # per client
+    rate_limit_burst: int = Field(40, gt=0)
+
     # Secrets / API Keys
     api_key: str = ""
 
+    # Request profiling (see middleware/profiling.py)
+    profiling_secret: str = ""       # enables signed X-Profile-Signature outside debug mode
+    profile_sample_rate: float = Field(0.0, ge=0, le=1)  # fraction of requests profiled in debug mode
+    profile_interval: float = Field(0.001, gt=0)         # sampler interval in seconds
+    profile_history: int = Field(20, gt=0)               # profiles kept in memory
+
     class Config:
         env_file = ".env"   # Load from .env file
         env_file_encoding = "utf-8"
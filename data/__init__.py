@@ -1,19 +1,41 @@
 # data/__init__.py
 import sqlite3
+from typing import NamedTuple
 
 
 DB_PATH = "data/spendings.db"
 
+SPENDINGS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS spendings (
+        transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        merchant_id INTEGER NOT NULL,
+        amount REAL NOT NULL
+    );
+"""
+
 def create_table(db = DB_PATH):
     conn = sqlite3.connect(db)
     cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS spendings (
-            transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            merchant_id INTEGER NOT NULL,
-            amount REAL NOT NULL
-        );
-    """)
+    cursor.execute(SPENDINGS_SCHEMA)
     conn.commit()
-    conn.close()
\ No newline at end of file
+    conn.close()
+
+
+class SpendingRecord(NamedTuple):
+    """
+    Internal row of the spendings table.
+
+    A plain tuple underneath (no per-row __dict__), so it is much cheaper
+    than sqlite3.Row -> dict -> Pydantic model. Only used inside the app;
+    the API boundary turns it into JSON directly.
+    """
+    transaction_id: int
+    user_id: int
+    merchant_id: int
+    amount: float
+
+
+def spending_row_factory(cursor: sqlite3.Cursor, row: tuple) -> SpendingRecord:
+    # For SELECT transaction_id, user_id, merchant_id, amount ... only
+    return SpendingRecord(*row)
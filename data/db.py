@@ -3,57 +3,101 @@ Database Layer
 
 This module provides:
 
-1. get_db()
-    - Yields a per-request SQLite connection
-    - Ensures that every request gets its own connection
-    - Closes connection automatically after use
+1. get_repository()
+    - Yields the SpendingRepository selected by Settings.database_url
+        - sqlite:///<path>  -> SQLiteSpendingRepository (per-request connection)
+        - memory://         -> InMemorySpendingRepository (one per process)
+    - Routers and services depend on this; nothing opens raw connections
 
 2. lifespan()
     - Executed once when the FastAPI app starts
     - Ensures database file exists
     - Creates required tables
     - Seeds the database (optional)
-    - Closes out at shutdown
+    - Starts the precompute scheduler (app.state.scheduler)
+    - Stops the scheduler at shutdown
 
 These are not shown in Swagger because they are infrastructure.
 """
 
 import sqlite3
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 from fastapi import FastAPI
 
 from config.settings import get_settings
-from data import DB_PATH, create_table
+from data import create_table
+from data.repository import SQLiteSpendingRepository, InMemorySpendingRepository
 from data.seed_data import generate_mock_data
+from services.scheduler import PrecomputeScheduler
 
+SQLITE_PREFIX = "sqlite:///"
+MEMORY_URL = "memory://"
 
-def get_db():
+# Shared by every request when database_url is memory://
+_memory_repository = InMemorySpendingRepository()
+
+
+def sqlite_path(database_url: str) -> str:
+    '''
+    sqlite:///data/spendings.db  -> data/spendings.db
+    sqlite:////tmp/spendings.db  -> /tmp/spendings.db
+    '''
+    if not database_url.startswith(SQLITE_PREFIX):
+        raise ValueError(f"Not a SQLite database URL: {database_url!r}")
+    return database_url[len(SQLITE_PREFIX):]
+
+
+@contextmanager
+def open_repository():
     '''
-    Opens the DB
-    Yields the DB connection
-    Closes it after the request is finished
-    -> prevents DB leaks
+    Opens the repository configured by DATABASE_URL.
+    Usable outside of requests (scripts, background jobs).
     '''
-    # Creates/opens spendings.db in current folder
-    conn = sqlite3.connect(DB_PATH) 
-    # Makes rows behave like dicts: row["user_id"]
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
+    database_url = get_settings().database_url
+    if database_url == MEMORY_URL:
+        yield _memory_repository
+    elif database_url.startswith(SQLITE_PREFIX):
+        conn = sqlite3.connect(sqlite_path(database_url))
+        conn.row_factory = sqlite3.Row
+        try:
+            yield SQLiteSpendingRepository(conn)
+        finally:
+            conn.close()
+    else:
+        raise ValueError(f"Unsupported DATABASE_URL: {database_url!r}")
+
+
+def get_repository():
+    '''
+    FastAPI dependency wrapping open_repository()
+    '''
+    with open_repository() as repository:
+        yield repository
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     settings = get_settings()
-    # Startup: create DB + table if needed
-    create_table(DB_PATH)
-    if settings.environment == "deployment" and not os.path.exists(DB_PATH):
-        generate_mock_data()
-        
+    # Startup: create DB + table if needed (memory:// needs no setup)
+    if settings.database_url != MEMORY_URL:
+        db_path = sqlite_path(settings.database_url)
+        create_table(db_path)
+        if settings.environment == "deployment" and not os.path.exists(db_path):
+            generate_mock_data(db_path)
+
+    # Background recomputation of recommendations / matrix stats
+    scheduler = PrecomputeScheduler(
+        open_repository,
+        interval=settings.precompute_interval,
+        max_staleness=settings.precompute_max_staleness,
+        cache_size=settings.precompute_cache_size,
+    )
+    if settings.precompute_enabled:
+        scheduler.start()
+    app.state.scheduler = scheduler
+
     yield  # App runs here
 
-    # Shutdown: nothing special for now
-    # (You could clean up global resources here if you had any.)
+    # Shutdown: stop the worker thread
+    scheduler.stop()
@@ -0,0 +1,203 @@
+"""
+Storage Backends
+
+This module provides the repository interface used by the routers and
+services to read and write spendings, plus two implementations:
+
+1. SQLiteSpendingRepository
+    - Wraps a single SQLite connection (one per request, see data.db)
+    - Same SQL as before, just moved out of the routers
+
+2. InMemorySpendingRepository
+    - Array-backed columns (transaction_id, user_id, merchant_id, amount)
+    - Per-user index lists pointing into the columns
+    - Process-local: data is lost on restart
+    - Meant for benchmarks and read-heavy replicas
+
+The backend is chosen from Settings.database_url (see data.db).
+"""
+
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from collections import Counter
+
+from data import SpendingRecord, spending_row_factory
+
+RECOMMENDATION_QUERY = """
+SELECT merchant_id
+FROM spendings
+WHERE user_id = ?
+GROUP BY merchant_id
+ORDER BY COUNT(*) DESC, merchant_id ASC
+LIMIT 1;
+"""
+
+# The in-memory backend rebuilds its columns once at least this many
+# deleted rows are held and they outnumber the live ones
+COMPACT_MIN_DEAD_ROWS = 1024
+
+
+class SpendingRepository(ABC):
+    """
+    Everything the API needs from the storage layer.
+
+    Rows are returned as SpendingRecord tuples.
+    """
+
+    @abstractmethod
+    def add_spending(self, user_id: int, merchant_id: int, amount: float) -> int:
+        """Insert one spending and return its transaction_id."""
+
+    @abstractmethod
+    def list_spendings(self, user_id: int) -> list[SpendingRecord]:
+        """All spendings of a user, in insertion order."""
+
+    @abstractmethod
+    def delete_spendings(self, user_id: int) -> list[SpendingRecord]:
+        """Delete all spendings of a user and return the deleted rows."""
+
+    @abstractmethod
+    def matrix_shape(self) -> tuple[int, int]:
+        """(distinct users, distinct merchants) of the user × merchant matrix."""
+
+    @abstractmethod
+    def top_merchant(self, user_id: int) -> int | None:
+        """
+        Most frequently used merchant of a user, None if the user has no spendings.
+        Ties go to the lowest merchant_id.
+        """
+
+
+class SQLiteSpendingRepository(SpendingRepository):
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+    def add_spending(self, user_id: int, merchant_id: int, amount: float) -> int:
+        cursor = self.db.cursor()
+        cursor.execute(
+            "INSERT INTO spendings (user_id, merchant_id, amount) VALUES (?, ?, ?)",
+            (user_id, merchant_id, amount),
+        )
+        self.db.commit()
+        return cursor.lastrowid
+
+    def list_spendings(self, user_id: int) -> list[SpendingRecord]:
+        cursor = self.db.cursor()
+        cursor.row_factory = spending_row_factory
+        return cursor.execute(
+            "SELECT transaction_id, user_id, merchant_id, amount FROM spendings "
+            "WHERE user_id = ? ORDER BY transaction_id",
+            (user_id,),
+        ).fetchall()
+
+    def delete_spendings(self, user_id: int) -> list[SpendingRecord]:
+        rows = self.list_spendings(user_id)
+        self.db.execute("DELETE FROM spendings WHERE user_id = ?", (user_id,))
+        self.db.commit()
+        return rows
+
+    def matrix_shape(self) -> tuple[int, int]:
+        users_nb, merchants_nb = self.db.execute(
+            "SELECT COUNT(DISTINCT user_id), COUNT(DISTINCT merchant_id) FROM spendings"
+        ).fetchone()
+        return users_nb, merchants_nb
+
+    def top_merchant(self, user_id: int) -> int | None:
+        row = self.db.execute(RECOMMENDATION_QUERY, (user_id,)).fetchone()
+        return row[0] if row else None
+
+
+class InMemorySpendingRepository(SpendingRepository):
+    """
+    Column store kept entirely in process memory.
+
+    Deleting unlinks rows from the per-user index, so reads only ever
+    touch the rows of the requested user. The dead rows are dropped from
+    the columns by _compact() once they pass COMPACT_MIN_DEAD_ROWS and
+    outnumber the live rows, which keeps memory bounded under
+    delete/re-insert workloads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._transaction_ids = array("q")
+        self._user_ids = array("q")
+        self._merchant_ids = array("q")
+        self._amounts = array("d")
+        # user_id -> positions of that user's live rows in the columns
+        self._user_index: dict[int, list[int]] = {}
+        # merchant_id -> number of live rows (for the matrix shape)
+        self._merchant_rows: Counter = Counter()
+        self._next_transaction_id = 1
+        self._dead_rows = 0
+
+    def _row(self, pos: int) -> SpendingRecord:
+        return SpendingRecord(
+            self._transaction_ids[pos],
+            self._user_ids[pos],
+            self._merchant_ids[pos],
+            self._amounts[pos],
+        )
+
+    def add_spending(self, user_id: int, merchant_id: int, amount: float) -> int:
+        with self._lock:
+            transaction_id = self._next_transaction_id
+            self._next_transaction_id += 1
+
+            pos = len(self._transaction_ids)
+            self._transaction_ids.append(transaction_id)
+            self._user_ids.append(user_id)
+            self._merchant_ids.append(merchant_id)
+            self._amounts.append(amount)
+
+            self._user_index.setdefault(user_id, []).append(pos)
+            self._merchant_rows[merchant_id] += 1
+            return transaction_id
+
+    def list_spendings(self, user_id: int) -> list[SpendingRecord]:
+        with self._lock:
+            return [self._row(pos) for pos in self._user_index.get(user_id, ())]
+
+    def delete_spendings(self, user_id: int) -> list[SpendingRecord]:
+        with self._lock:
+            positions = self._user_index.pop(user_id, [])
+            rows = [self._row(pos) for pos in positions]
+            for pos in positions:
+                merchant_id = self._merchant_ids[pos]
+                self._merchant_rows[merchant_id] -= 1
+                if not self._merchant_rows[merchant_id]:
+                    del self._merchant_rows[merchant_id]
+            self._dead_rows += len(positions)
+            live_rows = len(self._transaction_ids) - self._dead_rows
+            if self._dead_rows >= COMPACT_MIN_DEAD_ROWS and self._dead_rows > live_rows:
+                self._compact()
+            return rows
+
+    def _compact(self):
+        # Caller holds the lock. Live rows keep their relative (insertion) order.
+        live = sorted(pos for positions in self._user_index.values() for pos in positions)
+        new_pos = {old: new for new, old in enumerate(live)}
+
+        self._transaction_ids = array("q", (self._transaction_ids[pos] for pos in live))
+        self._user_ids = array("q", (self._user_ids[pos] for pos in live))
+        self._merchant_ids = array("q", (self._merchant_ids[pos] for pos in live))
+        self._amounts = array("d", (self._amounts[pos] for pos in live))
+        self._user_index = {
+            user_id: [new_pos[pos] for pos in positions]
+            for user_id, positions in self._user_index.items()
+        }
+        self._dead_rows = 0
+
+    def matrix_shape(self) -> tuple[int, int]:
+        with self._lock:
+            return len(self._user_index), len(self._merchant_rows)
+
+    def top_merchant(self, user_id: int) -> int | None:
+        with self._lock:
+            positions = self._user_index.get(user_id)
+            if not positions:
+                return None
+            counts = Counter(self._merchant_ids[pos] for pos in positions)
+        return min(counts, key=lambda merchant_id: (-counts[merchant_id], merchant_id))
@@ -10,11 +10,11 @@ from data import DB_PATH, create_table
 BASE_AMT = 3
 SCALING_FACTOR = 5
 
-def generate_mock_data():
+def generate_mock_data(db = DB_PATH):
     users = list(range(1,101))  # User IDs from 1 to 100
     merchants = list(range(1,4)) # Merchant IDs from 1 to 3
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db)
     cursor = conn.cursor()
     
     for user_id in users:
@@ -0,0 +1,83 @@
+"""
+Data Versions
+
+In-process version counters used to build ETags for the read endpoints.
+
+- One counter per user, bumped whenever that user's spendings change
+- One global counter, bumped on every change
+
+The ETag dependencies answer If-None-Match with 304 before the endpoint
+(and therefore the database) runs. ETags are weak (W/"..."): the same
+version may be sent gzip-compressed or not (see middleware/compression.py).
+
+The counters live in process memory: they are exact for a single worker
+(the default Docker setup) and for the memory:// backend. With several
+workers sharing one SQLite file, set ETAG_CACHING=False.
+"""
+
+import secrets
+import threading
+
+from fastapi import HTTPException, Request
+
+from config.settings import get_settings
+
+
+class DataVersions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Changes on every restart, so old ETags never match a fresh process
+        self.epoch = secrets.token_hex(4)
+        self.global_version = 0
+        self._user_versions: dict[int, int] = {}
+
+    def bump(self, user_id: int):
+        with self._lock:
+            self.global_version += 1
+            self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+
+    def user_etag(self, user_id: int) -> str:
+        return f'W/"{self.epoch}-u{user_id}-{self._user_versions.get(user_id, 0)}"'
+
+    def global_etag(self) -> str:
+        return f'W/"{self.epoch}-g{self.global_version}"'
+
+
+data_versions = DataVersions()
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" matches "x"
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque_tag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _check(request: Request, etag: str) -> str | None:
+    if not get_settings().etag_caching:
+        return None
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers={"ETag": etag})
+    return etag
+
+
+def user_etag(user_id: int, request: Request) -> str | None:
+    '''
+    Dependency for per-user resources.
+    Raises 304 if the client already has the current version,
+    otherwise returns the ETag to send (None when ETags are disabled).
+    '''
+    return _check(request, data_versions.user_etag(user_id))
+
+
+def global_etag(request: Request) -> str | None:
+    '''
+    Same as user_etag() for resources built from all users' data.
+    '''
+    return _check(request, data_versions.global_etag())
@@ -4,12 +4,13 @@ Main Application Entry Point
 This file:
 
 - Creates the FastAPI app
-- Configures middleware (request timing)
+- Configures middleware (admission control, compression, request timing, profiling)
 - Includes all routers
 - Loads lifespan() for DB initialization
 - Provides a clean modular structure
 
 Routers included:
+- admin_router
 - health_router
 - user_router
 - spending_router
@@ -22,8 +23,18 @@ import logging
 
 from fastapi import FastAPI, Request
 
+from config.settings import get_settings
 from data.db import lifespan
+from middleware import (
+    AdmissionController,
+    AdmissionMiddleware,
+    CompressionMiddleware,
+    ProfilingMiddleware,
+    RequestProfiler,
+    profiling_enabled,
+)
 from routers import (
+    admin_router,
     health_router,
     user_router,
     spending_router,
@@ -31,9 +42,12 @@ from routers import (
     recommendation_router,
 )
 
+settings = get_settings()
+
 app = FastAPI(lifespan=lifespan)
 
 # Include routers
+app.include_router(admin_router)
 app.include_router(health_router)
 app.include_router(user_router)
 app.include_router(spending_router)
@@ -52,6 +66,20 @@ logging.basicConfig(
 # custom logger to write logs to file
 logger = logging.getLogger("app")
 
+# Admission control: concurrency limits per route group + per-client rate limits.
+# Stats are served by /health/admission via app.state.admission
+if settings.admission_control:
+    app.state.admission = AdmissionController.from_settings(settings)
+    app.add_middleware(AdmissionMiddleware, controller=app.state.admission)
+
+# Gzip for large responses, negotiated via Accept-Encoding
+if settings.gzip_compression:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.gzip_minimum_size,
+        compresslevel=settings.gzip_compresslevel,
+    )
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     start_time = time.perf_counter()
@@ -68,3 +96,9 @@ async def log_requests(request: Request, call_next):
 
     # Don't touch the response (no headers/body changed)
     return response
+
+# Profiling: outermost, so a profile covers every other middleware.
+# Not installed at all unless debug mode (outside deployment) or a signing secret is configured
+if profiling_enabled(settings):
+    app.state.profiler = RequestProfiler.from_settings(settings)
+    app.add_middleware(ProfilingMiddleware, profiler=app.state.profiler)
@@ -0,0 +1,5 @@
+# middleware/__init__.py
+from .admission import AdmissionController, AdmissionMiddleware
+from .compression import CompressionMiddleware
+
+from .profiling import ProfilingMiddleware, RequestProfiler, profiling_enabled
@@ -0,0 +1,232 @@
+"""
+Admission Control
+
+Protects the service when traffic spikes, before any work reaches the
+threadpool and the blocking database calls behind it.
+
+1. Concurrency limit per route group
+    - writes           -> POST/PUT/PATCH/DELETE /spendings
+    - reads            -> GET /spendings, GET /matrix_properties
+    - recommendations  -> /recommendations
+    - A request over the limit waits in a bounded queue for a short time
+    - Queue full or wait timed out -> 503 + Retry-After
+
+2. Token-bucket rate limit per client (client IP)
+    - Applies to all grouped routes; health/user routes are never limited
+    - Bucket empty -> 429 + Retry-After
+
+AdmissionController.stats() publishes in-flight requests, queue depth and
+rejection counts (served by GET /health/admission).
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+
+from fastapi.responses import JSONResponse
+
+from config.settings import Settings
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Buckets of idle clients are dropped once this many clients are tracked
+MAX_TRACKED_CLIENTS = 10_000
+
+
+def route_group(method: str, path: str) -> str | None:
+    if path.startswith("/spendings"):
+        return "writes" if method in WRITE_METHODS else "reads"
+    if path.startswith("/matrix_properties"):
+        return "reads"
+    if path.startswith("/recommendations"):
+        return "recommendations"
+    return None
+
+
+class ConcurrencyLimiter:
+    """
+    At most `limit` requests in flight, at most `queue_size` waiting.
+    A finished request hands its slot directly to the oldest waiter.
+    """
+
+    def __init__(self, limit: int, queue_size: int):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.shed = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return False
+        except BaseException:
+            # Cancelled (client went away) after the slot was handed over
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self.admitted += 1
+        return True
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # slot moves to the waiter, in_flight unchanged
+                return
+        self.in_flight -= 1
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        limits: dict[str, int],
+        queue_size: int,
+        queue_timeout: float,
+        rate: float,
+        burst: int,
+    ):
+        self.groups = {
+            name: ConcurrencyLimiter(limit, queue_size) for name, limit in limits.items()
+        }
+        self.queue_timeout = queue_timeout
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "AdmissionController":
+        return cls(
+            limits={
+                "writes": settings.write_concurrency_limit,
+                "reads": settings.read_concurrency_limit,
+                "recommendations": settings.recommendation_concurrency_limit,
+            },
+            queue_size=settings.admission_queue_size,
+            queue_timeout=settings.admission_queue_timeout,
+            rate=settings.rate_limit_per_second,
+            burst=settings.rate_limit_burst,
+        )
+
+    def take_token(self, client: str) -> float:
+        '''
+        Takes one token from the client's bucket.
+        Returns 0 if allowed, otherwise seconds until a token is available.
+        '''
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            if len(self._buckets) >= MAX_TRACKED_CLIENTS:
+                self._drop_idle_buckets(now)
+            bucket = self._buckets[client] = TokenBucket(self.burst, now)
+        else:
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0.0
+        return (1 - bucket.tokens) / self.rate
+
+    def _drop_idle_buckets(self, now: float):
+        # A bucket that has refilled completely is the same as no bucket
+        refill_time = self.burst / self.rate
+        self._buckets = {
+            client: bucket
+            for client, bucket in self._buckets.items()
+            if now - bucket.updated < refill_time
+        }
+
+    def stats(self) -> dict:
+        return {
+            "clients_tracked": len(self._buckets),
+            "groups": {
+                name: {
+                    "limit": group.limit,
+                    "in_flight": group.in_flight,
+                    "queue_depth": group.queue_depth,
+                    "admitted": group.admitted,
+                    "rejected_rate_limited": group.rate_limited,
+                    "rejected_overloaded": group.shed,
+                }
+                for name, group in self.groups.items()
+            },
+        }
+
+
+class AdmissionMiddleware:
+    '''
+    ASGI middleware applying an AdmissionController to every HTTP request
+    '''
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        group_name = route_group(scope["method"], scope["path"])
+        if group_name is None:
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.controller
+        group = controller.groups[group_name]
+        client = scope["client"][0] if scope.get("client") else "anonymous"
+
+        wait = controller.take_token(client)
+        if wait:
+            group.rate_limited += 1
+            response = self._reject(429, "Rate limit exceeded", wait)
+            await response(scope, receive, send)
+            return
+
+        if not await group.acquire(controller.queue_timeout):
+            group.shed += 1
+            response = self._reject(503, "Service overloaded", controller.queue_timeout)
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.release()
+
+    @staticmethod
+    def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+        return JSONResponse(
+            {"detail": detail},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
@@ -0,0 +1,58 @@
+"""
+Response Compression
+
+Gzip compression (stdlib gzip/zlib) for large responses such as
+GET/DELETE /spendings/{user_id}.
+
+Built on Starlette's GZipMiddleware, which already:
+- leaves bodies smaller than `minimum_size` untouched
+- compresses streaming responses chunk by chunk, without buffering the body
+- adds `Vary: Accept-Encoding`
+
+On top of that, Accept-Encoding is negotiated properly: `gzip;q=0` (or
+`*;q=0` without an explicit gzip entry) disables compression, where the
+plain substring check upstream would still compress.
+
+Level and threshold come from Settings (GZIP_COMPRESSLEVEL, GZIP_MINIMUM_SIZE);
+benchmarks/bench_gzip.py shows the bandwidth vs CPU tradeoff per level.
+"""
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    '''
+    "gzip, br"      -> True
+    "gzip;q=0, br"  -> False
+    "*"             -> True
+    '''
+    wildcard = False
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding == "gzip":
+            return quality > 0
+        if coding == "*":
+            wildcard = quality > 0
+    return wildcard
+
+
+class CompressionMiddleware(GZipMiddleware):
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
@@ -0,0 +1,301 @@
+"""
+Request Profiling
+
+Opt-in profiling of single requests, for finding out where the time of a
+slow endpoint goes (Pydantic, sqlite3, JSON, middleware...).
+
+Selecting a request:
+- DEBUG_MODE=True and ENVIRONMENT is not "deployment"
+    - header `X-Profile: sample` or `X-Profile: cprofile`
+    - or randomly, for PROFILE_SAMPLE_RATE of all requests (sample mode)
+- any mode, if PROFILING_SECRET is set
+    - header `X-Profile-Signature: <unix ts>:<hex HMAC-SHA256(secret, "<ts>:<METHOD>:<path>")>`
+    - optional `X-Profile` header picks the mode
+    - signatures older than SIGNATURE_MAX_AGE seconds are ignored
+    - each signature is accepted once: used ones are remembered until they
+      expire, so a leaked header cannot keep forcing the sampler on traffic
+      (per process: with N workers it can be replayed at most N-1 times)
+
+Modes:
+- sample    -> stack sampler over all threads (covers the threadpool where
+               sync endpoints and sqlite3 run); collapsed-stack output
+- cprofile  -> deterministic cProfile of the event-loop thread only
+               (middleware, routing, serialization)
+
+Only one request is profiled at a time. The last PROFILE_HISTORY profiles are
+kept in memory and served by /admin/profiles. The profiled response carries
+an `X-Profile-Id` header.
+
+main.py only installs the middleware when profiling_enabled() says so, so
+there is no overhead at all otherwise.
+"""
+
+import cProfile
+import hashlib
+import hmac
+import io
+import itertools
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+
+from config.settings import Settings
+
+MODES = ("sample", "cprofile")
+SIGNATURE_MAX_AGE = 300
+
+# Threads parked in these files are idle (threadpool workers, event loop
+# waiting on sockets) and would otherwise dominate every sample
+IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+
+
+def sign(secret: str, timestamp: int, method: str, path: str) -> str:
+    '''
+    Builds the X-Profile-Signature value for a request
+    '''
+    message = f"{timestamp}:{method}:{path}".encode()
+    digest = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+    return f"{timestamp}:{digest}"
+
+
+def unsigned_profiling_allowed(settings: Settings) -> bool:
+    '''
+    Unsigned X-Profile headers (and random sampling) are a development aid
+    only; in deployment a signed header is always required
+    '''
+    return settings.debug_mode and settings.environment != "deployment"
+
+
+def profiling_enabled(settings: Settings) -> bool:
+    return unsigned_profiling_allowed(settings) or bool(settings.profiling_secret)
+
+
+@dataclass(slots=True)
+class ProfileRecord:
+    id: int
+    method: str
+    path: str
+    mode: str
+    started_at: float
+    duration: float
+    status_code: int | None
+    output: str
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "duration_seconds": self.duration,
+            "status_code": self.status_code,
+        }
+
+
+class StackSampler:
+    '''
+    Samples the stacks of every other thread every `interval` seconds
+    and counts them in collapsed form ("root;...;leaf")
+    '''
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(
+                        f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+                    )
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+
+    def report(self) -> str:
+        lines = [f"# {self.samples} samples every {self.interval * 1000:g} ms (collapsed stacks)"]
+        lines += [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + "\n"
+
+
+class RequestProfiler:
+    def __init__(
+        self,
+        allow_unsigned: bool,
+        secret: str,
+        sample_rate: float,
+        interval: float,
+        history: int,
+    ):
+        self.allow_unsigned = allow_unsigned
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.profiles: deque[ProfileRecord] = deque(maxlen=history)
+        self._ids = itertools.count(1)
+        self._busy = threading.Lock()
+        # signature -> time it expires; only signatures still inside SIGNATURE_MAX_AGE
+        self._used_signatures: dict[str, float] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RequestProfiler":
+        return cls(
+            allow_unsigned=unsigned_profiling_allowed(settings),
+            secret=settings.profiling_secret,
+            sample_rate=settings.profile_sample_rate,
+            interval=settings.profile_interval,
+            history=settings.profile_history,
+        )
+
+    def select(self, method: str, path: str, headers: dict[str, str]) -> str | None:
+        '''
+        Returns the profiling mode for a request, or None to not profile it
+        '''
+        mode = headers.get("x-profile", "sample").lower()
+        if mode not in MODES:
+            mode = "sample"
+
+        signature = headers.get("x-profile-signature")
+        if signature and self.secret and self._valid_signature(signature, method, path):
+            return mode
+        if self.allow_unsigned:
+            if "x-profile" in headers:
+                return mode
+            if self.sample_rate and random.random() < self.sample_rate:
+                return "sample"
+        return None
+
+    def _valid_signature(self, signature: str, method: str, path: str) -> bool:
+        timestamp, _, _ = signature.partition(":")
+        now = time.time()
+        if not timestamp.isdigit() or abs(now - int(timestamp)) > SIGNATURE_MAX_AGE:
+            return False
+        expected = sign(self.secret, int(timestamp), method, path)
+        if not hmac.compare_digest(signature, expected):
+            return False
+
+        # Replay protection. Expired entries are dropped here; the age check
+        # above already rejects them.
+        self._used_signatures = {
+            used: expires for used, expires in self._used_signatures.items() if expires > now
+        }
+        if signature in self._used_signatures:
+            return False
+        self._used_signatures[signature] = int(timestamp) + SIGNATURE_MAX_AGE
+        return True
+
+    def begin(self) -> int | None:
+        '''
+        Reserves the profiler for one request.
+        Returns a profile id, or None if another request is being profiled.
+        '''
+        if not self._busy.acquire(blocking=False):
+            return None
+        return next(self._ids)
+
+    def end(self, record: ProfileRecord):
+        self.profiles.append(record)
+        self._busy.release()
+
+    def get(self, profile_id: int) -> ProfileRecord | None:
+        for record in self.profiles:
+            if record.id == profile_id:
+                return record
+        return None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profiler = self.profiler
+        headers = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope["headers"]
+            if key.startswith(b"x-profile")
+        }
+        mode = profiler.select(scope["method"], scope["path"], headers)
+        # One profiled request at a time; others just run normally
+        profile_id = profiler.begin() if mode else None
+        if profile_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = None
+
+        async def send_with_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", str(profile_id).encode())
+                ]
+            await send(message)
+
+        started_at = time.time()
+        start = time.perf_counter()
+        if mode == "cprofile":
+            collector = cProfile.Profile()
+            collector.enable()
+        else:
+            collector = StackSampler(profiler.interval)
+            collector.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration = time.perf_counter() - start
+            output = ""
+            try:
+                if mode == "cprofile":
+                    collector.disable()
+                    out = io.StringIO()
+                    pstats.Stats(collector, stream=out).sort_stats("cumulative").print_stats(50)
+                    output = out.getvalue()
+                else:
+                    collector.stop()
+                    output = collector.report()
+            finally:
+                # Always release the profiler, even if the report failed,
+                # or no request could ever be profiled again
+                profiler.end(
+                    ProfileRecord(
+                        id=profile_id,
+                        method=scope["method"],
+                        path=scope["path"],
+                        mode=mode,
+                        started_at=started_at,
+                        duration=duration,
+                        status_code=status_code,
+                        output=output,
+                    )
+                )
@@ -1,4 +1,5 @@
 # routers/__init__.py
+from .admin_router import router as admin_router
 from .health_router import router as health_router
 from .user_router import router as user_router
 from .spending_router import router as spending_router
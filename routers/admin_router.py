@@ -0,0 +1,82 @@
+# routers/admin_router.py
+
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from config.settings import get_settings, Settings
+from middleware.profiling import RequestProfiler, unsigned_profiling_allowed
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def get_profiler(
+    request: Request,
+    x_api_key: str | None = Header(None),
+    settings: Settings = Depends(get_settings),
+) -> RequestProfiler:
+    # The API key is required whenever one is configured; without one,
+    # access is only open in debug mode outside deployment
+    if settings.api_key:
+        if not x_api_key or not hmac.compare_digest(x_api_key, settings.api_key):
+            raise HTTPException(status_code=403, detail="Admin access denied")
+    elif not unsigned_profiling_allowed(settings):
+        raise HTTPException(status_code=403, detail="Admin access denied")
+    profiler = getattr(request.app.state, "profiler", None)
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    return profiler
+
+
+@router.get(
+    "/profiles",
+    summary="List captured request profiles",
+    description="""
+Lists the request profiles kept in memory, newest first.
+
+Profiles are captured by the profiling middleware for requests selected
+with the `X-Profile` header (debug mode outside deployment), a signed
+`X-Profile-Signature` header, or random sampling (`PROFILE_SAMPLE_RATE`).
+
+An `X-API-Key` header matching `API_KEY` is required whenever `API_KEY` is set.
+Without an API key, access is only allowed in debug mode outside deployment.
+
+### Responses
+- **200 OK** – list of profile summaries  
+- **403 Forbidden** – missing or wrong API key  
+- **404 Not Found** – profiling is disabled  
+""",
+)
+def list_profiles(profiler: RequestProfiler = Depends(get_profiler)):
+    return [record.summary() for record in reversed(profiler.profiles)]
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    summary="Download a captured request profile",
+    description="""
+Downloads one profile as plain text:
+
+- `sample` mode → collapsed stacks (`frame;frame;frame count`), ready for flamegraph tools  
+- `cprofile` mode → `pstats` report sorted by cumulative time  
+
+### Responses
+- **200 OK** – profile text  
+- **403 Forbidden** – missing or wrong API key  
+- **404 Not Found** – unknown profile id, or profiling is disabled  
+""",
+    response_class=PlainTextResponse,
+)
+def download_profile(
+    profile_id: int,
+    profiler: RequestProfiler = Depends(get_profiler),
+):
+    record = profiler.get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        record.output,
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{record.id}-{record.mode}.txt"'
+        },
+    )
@@ -1,7 +1,8 @@
 # routers/health_router.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
 from config.settings import get_settings, Settings
+from services.scheduler import PrecomputeScheduler, get_scheduler
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -47,3 +48,47 @@ def info(settings: Settings = Depends(get_settings)):
         "debug": settings.debug_mode,
         "database": settings.database_url,
     }
+
+
+@router.get(
+    "/admission",
+    summary="Get admission control statistics",
+    description="""
+Returns the live state of the admission controller for each route group
+(`writes`, `reads`, `recommendations`):
+
+- Concurrency limit and requests currently in flight  
+- Queue depth (requests waiting for a slot)  
+- Admitted requests  
+- Rejections: rate limited (**429**) and overloaded (**503**)  
+
+### Responses
+- **200 OK** – admission statistics  
+- **404 Not Found** – admission control is disabled  
+""",
+)
+def admission(request: Request):
+    controller = getattr(request.app.state, "admission", None)
+    if controller is None:
+        raise HTTPException(status_code=404, detail="Admission control is disabled")
+    return controller.stats()
+
+
+@router.get(
+    "/jobs",
+    summary="Get background precompute job status",
+    description="""
+Returns the state of the precompute scheduler that refreshes recommendations
+and matrix statistics in the background:
+
+- Whether the worker thread is running  
+- Backlog (dirty results waiting for the next run)  
+- Number of results currently stale  
+- Processed / failed jobs and timing of the last run  
+
+### Responses
+- **200 OK** – scheduler status  
+""",
+)
+def jobs(scheduler: PrecomputeScheduler = Depends(get_scheduler)):
+    return scheduler.stats()
@@ -1,8 +1,8 @@
 # routers/matrix_router.py
 
-from fastapi import APIRouter, Depends
-import sqlite3
-from data.db import get_db
+from fastapi import APIRouter, Depends, Response
+from data.versions import global_etag
+from services.scheduler import PrecomputeScheduler, get_scheduler
 
 router = APIRouter(
     tags=["matrix"]
@@ -17,22 +17,23 @@ Returns information about the implicit **user × merchant** spending matrix.
 ### Logic
 - Counts distinct users  
 - Counts distinct merchants  
+- Both are precomputed in the background (see `/health/jobs`)  
 - Returns the matrix dimension (`rows × columns`)  
+- Sends an `ETag`; a matching `If-None-Match` gets **304** without a query  
 
 ### Responses
 - **200 OK** – matrix dimension returned successfully  
+- **304 Not Modified** – no spending changed since the given ETag  
 """,
 )
-def matrix_properties(db: sqlite3.Connection = Depends(get_db)):
-    cursor = db.cursor()
-
-    users_nb = cursor.execute(
-        "SELECT COUNT(DISTINCT user_id) FROM spendings"
-    ).fetchone()[0]
-
-    merchants_nb = cursor.execute(
-        "SELECT COUNT(DISTINCT merchant_id) FROM spendings"
-    ).fetchone()[0]
+def matrix_properties(
+    response: Response,
+    etag: str | None = Depends(global_etag),
+    scheduler: PrecomputeScheduler = Depends(get_scheduler),
+):
+    (users_nb, merchants_nb), fresh = scheduler.matrix_shape()
+    if etag and fresh:
+        response.headers["ETag"] = etag
 
     return {
         "rows": users_nb,
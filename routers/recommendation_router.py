@@ -1,9 +1,8 @@
 # routers/recommendation_router.py
 
-from fastapi import APIRouter, Depends
-from services.recommender import RecommenderService
-from data.db import get_db
-import sqlite3
+from fastapi import APIRouter, Depends, Response
+from services.scheduler import PrecomputeScheduler, get_scheduler
+from data.versions import user_etag
 
 router = APIRouter(
     prefix="/recommendations",
@@ -11,10 +10,6 @@ router = APIRouter(
 )
 
 
-def get_recommender(db: sqlite3.Connection = Depends(get_db)) -> RecommenderService:
-    return RecommenderService(db)
-
-
 @router.get(
     "/{user_id}",
     summary="Get a merchant recommendation for a user",
@@ -26,6 +21,9 @@ Returns the **most frequently visited merchant** for the specified user.
 - Groups transactions by merchant  
 - Selects the merchant with the highest count  
 - If user has never spent anywhere → returns `None`  
+- The result is precomputed in the background and may lag writes by up to
+  `PRECOMPUTE_MAX_STALENESS` seconds  
+- Sends an `ETag`; a matching `If-None-Match` gets **304** without a query  
 
 ### Example
 ```json
@@ -37,13 +35,18 @@ Returns the **most frequently visited merchant** for the specified user.
 
 ### Responses
 - **200 OK** – recommendation computed  
+- **304 Not Modified** – the user's spendings did not change  
 """,
 )
 def get_recommendations(
     user_id: int,
-    recommender: RecommenderService = Depends(get_recommender),
+    response: Response,
+    etag: str | None = Depends(user_etag),
+    scheduler: PrecomputeScheduler = Depends(get_scheduler),
 ):
-    merchant_id = recommender.recommend(user_id)
+    merchant_id, fresh = scheduler.recommendation(user_id)
+    if etag and fresh:
+        response.headers["ETag"] = etag
     return {
         "user_id": user_id,
         "recommended_merchant_id": merchant_id
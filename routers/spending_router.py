@@ -1,9 +1,12 @@
 # routers/spending_router.py
 
 from fastapi import APIRouter, Depends, Body
-import sqlite3
+from fastapi.responses import JSONResponse
 from models.spending_model import SpendingIn, SpendingOut, SpendingDeleted
-from data.db import get_db
+from data.db import get_repository
+from data.repository import SpendingRepository
+from data.versions import data_versions, user_etag
+from services.scheduler import PrecomputeScheduler, get_scheduler
 
 router = APIRouter(
     prefix="/spendings",
@@ -45,11 +48,11 @@ spending_examples = {
     "",
     summary="Create a spending entry",
     description="""
-Creates a new spending entry in the SQLite database.
+Creates a new spending entry in the configured storage backend.
 
 ### Workflow
 - Validates the incoming spending object  
-- Inserts a new record into the `spendings` table  
+- Inserts a new record into the `spendings` store  
 - Returns the inserted row as a `SpendingOut` object  
 
 ### Responses
@@ -59,15 +62,16 @@ Creates a new spending entry in the SQLite database.
 )
 def create_spending(
     spending: SpendingIn = Body(..., openapi_examples=spending_examples),
-    db: sqlite3.Connection = Depends(get_db)
+    repository: SpendingRepository = Depends(get_repository),
+    scheduler: PrecomputeScheduler = Depends(get_scheduler),
 ):
-    cursor = db.cursor()
-    cursor.execute(
-        "INSERT INTO spendings (user_id, merchant_id, amount) VALUES (?, ?, ?)",
-        (spending.user_id, spending.merchant_id, spending.amount),
+    transaction_id = repository.add_spending(
+        spending.user_id, spending.merchant_id, spending.amount
     )
-    db.commit()
-    transaction_id = cursor.lastrowid
+    # Mark dirty before bumping the version: a read in between must not
+    # see the new ETag together with a result the scheduler calls fresh
+    scheduler.mark_dirty(spending.user_id)
+    data_versions.bump(spending.user_id)
     return SpendingOut(
         transaction_id=transaction_id,
         user_id=spending.user_id,
@@ -85,22 +89,27 @@ Returns all spending entries associated with a given `user_id`.
 ### Workflow
 - Queries the database for all transactions belonging to the user  
 - Returns them as a list of `SpendingOut` objects  
+- Sends an `ETag`; a matching `If-None-Match` gets **304** without a query  
 
 ### Responses
 - **200 OK** – list of spendings (possibly empty)
+- **304 Not Modified** – the user's spendings did not change
 """,
+    response_model=list[SpendingOut],
 )
 def get_spendings(
     user_id: int,
-    db: sqlite3.Connection = Depends(get_db),
+    etag: str | None = Depends(user_etag),
+    repository: SpendingRepository = Depends(get_repository),
 ):
-    cursor = db.cursor()
-    rows = cursor.execute(
-        "SELECT transaction_id, user_id, merchant_id, amount FROM spendings WHERE user_id = ?",
-        (user_id,),
-    ).fetchall()
+    rows = repository.list_spendings(user_id)
 
-    return [SpendingOut(**dict(row)) for row in rows]
+    # Rows come typed from the repository, so skip per-row Pydantic models
+    # and serialize them straight away (response_model is kept for the docs)
+    return JSONResponse(
+        [row._asdict() for row in rows],
+        headers={"ETag": etag} if etag else None,
+    )
 
 
 @router.delete(
@@ -121,27 +130,13 @@ Deletes every spending entry belonging to the specified user.
 )
 def delete_spendings(
     user_id: int,
-    db: sqlite3.Connection = Depends(get_db),
+    repository: SpendingRepository = Depends(get_repository),
+    scheduler: PrecomputeScheduler = Depends(get_scheduler),
 ):
-    cursor = db.cursor()
-
-    # Fetch existing spendings
-    rows = cursor.execute(
-        "SELECT transaction_id, user_id, merchant_id, amount FROM spendings WHERE user_id = ?",
-        (user_id,),
-    ).fetchall()
-
-    # Delete them
-    cursor.execute("DELETE FROM spendings WHERE user_id = ?", (user_id,))
-    db.commit()
-
-    return [
-        SpendingDeleted(
-            transaction_id=row["transaction_id"],
-            user_id=row["user_id"],
-            merchant_id=row["merchant_id"],
-            amount=row["amount"],
-            deleted=True,
-        )
-        for row in rows
-    ]
+    # Fetch existing spendings and delete them
+    rows = repository.delete_spendings(user_id)
+    if rows:
+        scheduler.mark_dirty(user_id)
+        data_versions.bump(user_id)
+
+    return JSONResponse([{**row._asdict(), "deleted": True} for row in rows])
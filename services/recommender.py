@@ -1,13 +1,17 @@
 """
 RecommenderService
 
-A very simple SQL-based recommender algorithm.
+A very simple frequency-based recommender algorithm.
 
 Current Logic:
 - For each user, count how many times they used each merchant
 - Select the merchant with the highest usage
 - Return that merchant_id
 
+The counting itself is done by the storage backend
+(SpendingRepository.top_merchant), so SQLite runs it as SQL and the
+in-memory backend runs it over the user's index list.
+
 Limitations:
 - No ranking
 - No ML
@@ -16,32 +20,12 @@ Limitations:
 - No collaborative filtering
 """
 
-import sqlite3
-
-RECOMMENDATION_QUERY = """
-SELECT merchant_id
-FROM (
-    SELECT user_id, merchant_id, COUNT(*) AS transaction_count
-    FROM spendings s
-    GROUP BY user_id, merchant_id
-    HAVING COUNT(*) = (
-        SELECT COUNT(*)
-        FROM spendings s2
-        WHERE s2.user_id = s.user_id
-        GROUP BY merchant_id
-        ORDER BY COUNT(*) DESC
-        LIMIT 1
-    )
-)
-WHERE user_id = ?;
-"""
+from data.repository import SpendingRepository
+
 
 class RecommenderService:
-    def __init__(self, db: sqlite3.Connection):
-        self.db = db
+    def __init__(self, repository: SpendingRepository):
+        self.repository = repository
 
     def recommend(self, user_id: int) -> int | None:
-        cursor = self.db.cursor()
-        cursor.execute(RECOMMENDATION_QUERY, (user_id,))
-        row = cursor.fetchone()
-        return row["merchant_id"] if row else None
+        return self.repository.top_merchant(user_id)
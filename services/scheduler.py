@@ -0,0 +1,237 @@
+"""
+PrecomputeScheduler
+
+Moves the expensive reads (recommendations, matrix shape) out of the
+request path.
+
+Current Logic:
+- Write endpoints call mark_dirty(user_id) after changing spendings
+- A worker thread wakes up every `interval` seconds, drains the dirty
+  set and recomputes the affected results with its own repository
+- Request handlers read the precomputed results
+    - fresh result                            -> served as is
+    - stale, but dirty for <= max_staleness   -> served, flagged not fresh
+      (only while the worker runs; nothing else would refresh it)
+    - missing, or stale for too long          -> computed inline and cached
+- At most `cache_size` results are kept (least recently used dropped first);
+  "no recommendation" for a user never written to is not cached at all
+
+Started and stopped by data.db.lifespan(); stats() backs GET /health/jobs.
+Results are per process, like the version counters in data/versions.py.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import AbstractContextManager
+from typing import Any, Callable, NamedTuple
+
+from fastapi import Request
+
+from data.repository import SpendingRepository
+from services.recommender import RecommenderService
+
+logger = logging.getLogger("app")
+
+MATRIX_KEY = ("matrix",)
+
+
+class Precomputed(NamedTuple):
+    value: Any
+    # False while serving a stale result inside the staleness bound;
+    # callers must not tag a stale value with the current ETag
+    fresh: bool
+
+
+def recommendation_key(user_id: int) -> tuple:
+    return ("recommendation", user_id)
+
+
+class PrecomputeScheduler:
+    def __init__(
+        self,
+        open_repository: Callable[[], AbstractContextManager[SpendingRepository]],
+        interval: float,
+        max_staleness: float,
+        cache_size: int,
+    ):
+        self.open_repository = open_repository
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self.cache_size = cache_size
+
+        self._lock = threading.Lock()
+        # key -> bumped by every mark_dirty(), results remember the one they saw
+        self._generations: dict[tuple, int] = {}
+        # key -> (value, generation it was computed at), in LRU order
+        self._results: OrderedDict[tuple, tuple] = OrderedDict()
+        # key -> time of the first change not yet reflected in _results
+        self._dirty_since: dict[tuple, float] = {}
+        self._pending: set[tuple] = set()
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.processed = 0
+        self.errors = 0
+        self.in_progress = 0
+        self.last_run_at: float | None = None
+        self.last_run_seconds: float | None = None
+
+    # Lifecycle
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="precompute-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # Write side
+
+    def mark_dirty(self, user_id: int):
+        now = time.monotonic()
+        with self._lock:
+            for key in (recommendation_key(user_id), MATRIX_KEY):
+                self._generations[key] = self._generations.get(key, 0) + 1
+                self._dirty_since.setdefault(key, now)
+                if self.running:
+                    self._pending.add(key)
+
+    # Read side
+
+    def recommendation(self, user_id: int) -> Precomputed:
+        return self._get(recommendation_key(user_id))
+
+    def matrix_shape(self) -> Precomputed:
+        return self._get(MATRIX_KEY)
+
+    def _get(self, key: tuple) -> Precomputed:
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            generation = self._generations.get(key, 0)
+            dirty_since = self._dirty_since.get(key)
+
+        if result is not None:
+            value, computed_at = result
+            if computed_at == generation:
+                return Precomputed(value, True)
+            if (
+                self.running
+                and dirty_since is not None
+                and time.monotonic() - dirty_since <= self.max_staleness
+            ):
+                return Precomputed(value, False)
+
+        # Missing, too stale, or no worker to refresh it: compute in the request
+        with self.open_repository() as repository:
+            return Precomputed(self._refresh(key, repository), True)
+
+    # Worker
+
+    def _compute(self, key: tuple, repository: SpendingRepository):
+        if key == MATRIX_KEY:
+            return repository.matrix_shape()
+        return RecommenderService(repository).recommend(key[1])
+
+    def _refresh(self, key: tuple, repository: SpendingRepository):
+        started = time.monotonic()
+        with self._lock:
+            generation = self._generations.get(key, 0)
+
+        value = self._compute(key, repository)
+
+        with self._lock:
+            current = self._results.get(key)
+            # Never overwrite a result computed from newer data.
+            # Unknown users (never written, nothing found) are not cached,
+            # so arbitrary ids cannot grow the cache.
+            if (current is None or current[1] <= generation) and (value is not None or generation):
+                self._results[key] = (value, generation)
+                self._results.move_to_end(key)
+                self._evict()
+            if self._generations.get(key, 0) == generation:
+                self._dirty_since.pop(key, None)
+            elif key in self._dirty_since:
+                # Writes landed during the compute: the result covers everything
+                # up to `generation`, so staleness restarts from the first later
+                # change, which happened after `started`
+                self._dirty_since[key] = started
+        return value
+
+    def _evict(self):
+        # Caller holds the lock. The matrix result is shared by every request,
+        # so it is never the one dropped.
+        while len(self._results) > self.cache_size:
+            key, result = self._results.popitem(last=False)
+            if key == MATRIX_KEY:
+                self._results[key] = result
+                if len(self._results) == 1:
+                    break
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                keys = list(self._pending)
+                self._pending.clear()
+                self.in_progress = len(keys)
+            if not keys:
+                continue
+
+            started = time.monotonic()
+            try:
+                with self.open_repository() as repository:
+                    for key in keys:
+                        if self._stop.is_set():
+                            break
+                        try:
+                            self._refresh(key, repository)
+                            self.processed += 1
+                        except Exception:
+                            self.errors += 1
+                            logger.exception(f"Precompute job {key} failed")
+                        finally:
+                            self.in_progress -= 1
+            except Exception:
+                self.errors += 1
+                logger.exception("Precompute run failed")
+            finally:
+                self.in_progress = 0
+                self.last_run_at = time.time()
+                self.last_run_seconds = time.monotonic() - started
+
+    def stats(self) -> dict:
+        with self._lock:
+            backlog = len(self._pending) + self.in_progress
+            stale = len(self._dirty_since)
+        return {
+            "running": self.running,
+            "backlog": backlog,
+            "stale_results": stale,
+            "processed": self.processed,
+            "errors": self.errors,
+            "last_run_at": self.last_run_at,
+            "last_run_seconds": self.last_run_seconds,
+            "cached_results": len(self._results),
+            "interval_seconds": self.interval,
+            "max_staleness_seconds": self.max_staleness,
+        }
+
+
+def get_scheduler(request: Request) -> PrecomputeScheduler:
+    '''
+    FastAPI dependency: the scheduler created by lifespan()
+    '''
+    return request.app.state.scheduler
@@ -0,0 +1,196 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from config.settings import Settings
+from middleware.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    ConcurrencyLimiter,
+    route_group,
+)
+from routers import health_router
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_acquire_under_limit():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=2, queue_size=0)
+        assert await limiter.acquire(timeout=0.1)
+        assert await limiter.acquire(timeout=0.1)
+        assert limiter.in_flight == 2
+        # Limit reached and no queue: fail fast
+        assert not await limiter.acquire(timeout=0.1)
+
+    run(scenario())
+
+
+def test_release_hands_slot_to_waiter():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=1)
+        assert await limiter.acquire(timeout=0.1)
+
+        waiter = asyncio.create_task(limiter.acquire(timeout=1.0))
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 1
+
+        limiter.release()
+        assert await waiter
+        # The slot moved to the waiter instead of being freed
+        assert limiter.in_flight == 1
+        assert limiter.queue_depth == 0
+
+        limiter.release()
+        assert limiter.in_flight == 0
+
+    run(scenario())
+
+
+def test_queue_full_is_rejected():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=1)
+        assert await limiter.acquire(timeout=0.1)
+        waiter = asyncio.create_task(limiter.acquire(timeout=1.0))
+        await asyncio.sleep(0)
+
+        assert not await limiter.acquire(timeout=1.0)
+
+        limiter.release()
+        assert await waiter
+
+    run(scenario())
+
+
+def test_queue_timeout_leaves_no_waiter_behind():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=4)
+        assert await limiter.acquire(timeout=0.1)
+
+        assert not await limiter.acquire(timeout=0.01)
+        assert limiter.queue_depth == 0
+
+        # Timed-out waiter must not swallow the slot
+        limiter.release()
+        assert limiter.in_flight == 0
+        assert await limiter.acquire(timeout=0.1)
+
+    run(scenario())
+
+
+def test_token_bucket_burst_then_retry_after():
+    controller = AdmissionController(
+        {"reads": 1}, queue_size=0, queue_timeout=1.0, rate=2.0, burst=3
+    )
+    assert [controller.take_token("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = controller.take_token("a")
+    assert 0 < wait <= 0.5
+    # Buckets are per client
+    assert controller.take_token("b") == 0.0
+
+
+def test_route_groups():
+    assert route_group("POST", "/spendings") == "writes"
+    assert route_group("DELETE", "/spendings/1") == "writes"
+    assert route_group("GET", "/spendings/1") == "reads"
+    assert route_group("GET", "/matrix_properties") == "reads"
+    assert route_group("GET", "/recommendations/1") == "recommendations"
+    assert route_group("GET", "/health/ping") is None
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("rate_limit_per_second", 0),
+        ("rate_limit_burst", 0),
+        ("read_concurrency_limit", 0),
+        ("admission_queue_size", -1),
+        ("admission_queue_timeout", 0),
+    ],
+)
+def test_settings_reject_invalid_limits(field, value):
+    with pytest.raises(ValidationError):
+        Settings(**{field: value})
+
+
+def make_app(controller):
+    '''
+    The real middleware and /health/admission in front of stub endpoints;
+    /recommendations blocks until `release` is set
+    '''
+    app = FastAPI()
+    app.state.admission = controller
+    app.state.release = asyncio.Event()
+    app.include_router(health_router)
+
+    @app.get("/spendings/{user_id}")
+    async def spendings(user_id: int):
+        return []
+
+    @app.get("/recommendations/{user_id}")
+    async def recommendations(user_id: int):
+        await app.state.release.wait()
+        return {}
+
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    return app
+
+
+def make_controller(**overrides):
+    options = dict(
+        limits={"writes": 1, "reads": 1, "recommendations": 1},
+        queue_size=0,
+        queue_timeout=0.05,
+        rate=100.0,
+        burst=100,
+    )
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+def test_middleware_rate_limits_grouped_routes_only():
+    client = TestClient(make_app(make_controller(rate=0.01, burst=2)))
+
+    assert [client.get("/spendings/1").status_code for _ in range(3)] == [200, 200, 429]
+    response = client.get("/spendings/1")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    # Health routes are never limited
+    assert all(client.get("/health/ping").status_code == 200 for _ in range(5))
+
+    reads = client.get("/health/admission").json()["groups"]["reads"]
+    assert reads["admitted"] == 2
+    assert reads["rejected_rate_limited"] == 2
+    assert reads["in_flight"] == 0
+
+
+def test_middleware_sheds_load_with_503():
+    async def scenario():
+        app = make_app(make_controller())
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/recommendations/1"))
+            while app.state.admission.groups["recommendations"].in_flight == 0:
+                await asyncio.sleep(0.001)
+
+            second = await client.get("/recommendations/2")
+            assert second.status_code == 503
+            assert second.headers["Retry-After"] == "1"
+            # Other groups are not affected
+            assert (await client.get("/spendings/1")).status_code == 200
+
+            app.state.release.set()
+            assert (await first).status_code == 200
+            return (await client.get("/health/admission")).json()["groups"]
+
+    groups = run(scenario())
+    assert groups["recommendations"]["admitted"] == 1
+    assert groups["recommendations"]["rejected_overloaded"] == 1
+    assert groups["recommendations"]["in_flight"] == 0
+    assert groups["reads"]["rejected_overloaded"] == 0
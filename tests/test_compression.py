@@ -0,0 +1,107 @@
+import asyncio
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse, StreamingResponse
+
+from middleware.compression import CompressionMiddleware, accepts_gzip
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", False),
+        ("gzip", True),
+        ("gzip, deflate, br", True),
+        ("GZIP", True),
+        ("br", False),
+        ("gzip;q=0", False),
+        ("gzip; q=0.0, br", False),
+        ("gzip;q=0.5", True),
+        ("gzip;q=abc", False),
+        ("*", True),
+        ("identity, *;q=0", False),
+        ("gzip;q=1, *;q=0", True),
+        ("*;q=0, gzip", True),
+    ],
+)
+def test_accepts_gzip(accept_encoding, expected):
+    assert accepts_gzip(accept_encoding) is expected
+
+
+BODY = b"spending," * 500  # well above MINIMUM_SIZE
+MINIMUM_SIZE = 1024
+
+
+def make_client(body):
+    async def app(scope, receive, send):
+        await PlainTextResponse(body)(scope, receive, send)
+
+    return TestClient(CompressionMiddleware(app, minimum_size=MINIMUM_SIZE, compresslevel=6))
+
+
+def test_large_body_is_gzipped():
+    response = make_client(BODY).get("/", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) < len(BODY)
+    assert response.content == BODY  # httpx decompresses
+
+
+def test_small_body_is_sent_as_is():
+    response = make_client(b"small").get("/", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.content == b"small"
+
+
+def test_gzip_refused_by_client():
+    response = make_client(BODY).get("/", headers={"Accept-Encoding": "gzip;q=0, br"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.content == BODY
+
+
+def test_streaming_response_is_compressed_chunk_by_chunk():
+    chunks = [BODY[i:i + 1500] for i in range(0, len(BODY), 1500)]
+    events = []
+
+    async def stream():
+        for chunk in chunks:
+            events.append("produced")
+            yield chunk
+
+    async def app(scope, receive, send):
+        await StreamingResponse(stream(), media_type="text/plain")(scope, receive, send)
+
+    messages = []
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message["body"]:
+            events.append("sent")
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    middleware = CompressionMiddleware(app, minimum_size=MINIMUM_SIZE, compresslevel=6)
+    asyncio.run(middleware(scope, receive, send))
+
+    headers = dict(messages[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    assert b"accept-encoding" in headers[b"vary"].lower()
+    # Compressed data went out before the last chunk was produced: not buffered
+    last_produced = max(i for i, event in enumerate(events) if event == "produced")
+    assert events.index("sent") < last_produced
+    assert events.count("sent") > 1
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    assert gzip.decompress(body) == BODY
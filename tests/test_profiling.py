@@ -0,0 +1,117 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from config.settings import Settings
+from middleware.profiling import (
+    ProfilingMiddleware,
+    SIGNATURE_MAX_AGE,
+    RequestProfiler,
+    StackSampler,
+    profiling_enabled,
+    sign,
+)
+
+SECRET = "s3cret"
+
+
+def make_profiler(allow_unsigned=False):
+    return RequestProfiler(
+        allow_unsigned=allow_unsigned, secret=SECRET, sample_rate=0.0, interval=0.001, history=5
+    )
+
+
+def test_valid_signature():
+    profiler = make_profiler()
+    signature = sign(SECRET, int(time.time()), "GET", "/recommendations/1")
+    assert profiler._valid_signature(signature, "GET", "/recommendations/1")
+
+
+@pytest.mark.parametrize(
+    "signature",
+    [
+        sign(SECRET, int(time.time()), "GET", "/spendings/1"),       # other path
+        sign(SECRET, int(time.time()), "POST", "/recommendations/1"),  # other method
+        sign("wrong", int(time.time()), "GET", "/recommendations/1"),  # other secret
+        sign(SECRET, int(time.time()) - 3600, "GET", "/recommendations/1"),  # too old
+        "not-a-signature",
+        "123:",
+        "",
+    ],
+)
+def test_invalid_signature(signature):
+    assert not make_profiler()._valid_signature(signature, "GET", "/recommendations/1")
+
+
+def test_signature_is_accepted_once():
+    profiler = make_profiler()
+    headers = {"x-profile-signature": sign(SECRET, int(time.time()), "GET", "/spendings/1")}
+
+    assert profiler.select("GET", "/spendings/1", headers) == "sample"
+    assert profiler.select("GET", "/spendings/1", headers) is None
+
+
+def test_expired_signatures_are_forgotten():
+    profiler = make_profiler()
+    old = sign(SECRET, int(time.time()) - SIGNATURE_MAX_AGE - 1, "GET", "/spendings/1")
+    profiler._used_signatures[old] = time.time() - 1
+
+    fresh = sign(SECRET, int(time.time()), "GET", "/spendings/1")
+    assert profiler._valid_signature(fresh, "GET", "/spendings/1")
+    assert old not in profiler._used_signatures
+
+
+def test_unsigned_header_needs_allow_unsigned():
+    headers = {"x-profile": "cprofile"}
+    assert make_profiler(allow_unsigned=False).select("GET", "/spendings/1", headers) is None
+    assert make_profiler(allow_unsigned=True).select("GET", "/spendings/1", headers) == "cprofile"
+
+
+def test_signed_header_selects_mode():
+    headers = {
+        "x-profile": "cprofile",
+        "x-profile-signature": sign(SECRET, int(time.time()), "GET", "/spendings/1"),
+    }
+    assert make_profiler().select("GET", "/spendings/1", headers) == "cprofile"
+
+
+def test_profiling_disabled_in_deployment_without_secret():
+    assert not profiling_enabled(Settings(debug_mode=True, environment="deployment", profiling_secret=""))
+    assert profiling_enabled(Settings(debug_mode=True, environment="development", profiling_secret=""))
+    assert profiling_enabled(Settings(debug_mode=False, environment="deployment", profiling_secret="x"))
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("profile_history", -1),
+        ("profile_history", 0),
+        ("profile_interval", 0),
+        ("profile_sample_rate", -0.1),
+        ("profile_sample_rate", 1.5),
+    ],
+)
+def test_settings_reject_invalid_profiling_values(field, value):
+    with pytest.raises(ValidationError):
+        Settings(**{field: value})
+
+
+def test_failed_report_releases_profiler(monkeypatch):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    def broken_report(self):
+        raise RuntimeError("report failed")
+
+    monkeypatch.setattr(StackSampler, "report", broken_report)
+    profiler = make_profiler(allow_unsigned=True)
+    client = TestClient(ProfilingMiddleware(app, profiler))
+
+    with pytest.raises(RuntimeError):
+        client.get("/", headers={"X-Profile": "sample"})
+
+    assert profiler.begin() is not None
+    assert profiler.profiles[0].output == ""
@@ -0,0 +1,118 @@
+"""
+Conformance suite: every SpendingRepository backend must pass the same tests.
+"""
+
+import sqlite3
+
+import pytest
+
+import data.repository
+from data import SPENDINGS_SCHEMA, SpendingRecord
+from data.repository import InMemorySpendingRepository, SQLiteSpendingRepository
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def repository(request):
+    if request.param == "sqlite":
+        conn = sqlite3.connect(":memory:")
+        conn.execute(SPENDINGS_SCHEMA)
+        yield SQLiteSpendingRepository(conn)
+        conn.close()
+    else:
+        yield InMemorySpendingRepository()
+
+
+def test_add_spending_returns_increasing_ids(repository):
+    ids = [repository.add_spending(1, 1, 10.0) for _ in range(3)]
+    assert ids == [1, 2, 3]
+
+
+def test_list_spendings_in_insertion_order(repository):
+    repository.add_spending(1, 2, 5.0)
+    repository.add_spending(2, 1, 7.5)
+    repository.add_spending(1, 3, 1.25)
+
+    assert repository.list_spendings(1) == [
+        SpendingRecord(1, 1, 2, 5.0),
+        SpendingRecord(3, 1, 3, 1.25),
+    ]
+    assert repository.list_spendings(2) == [SpendingRecord(2, 2, 1, 7.5)]
+
+
+def test_list_spendings_unknown_user_is_empty(repository):
+    assert repository.list_spendings(42) == []
+
+
+def test_delete_spendings_returns_rows_and_empties_user(repository):
+    repository.add_spending(1, 2, 5.0)
+    repository.add_spending(2, 1, 7.5)
+    repository.add_spending(1, 3, 1.25)
+
+    deleted = repository.delete_spendings(1)
+
+    assert deleted == [SpendingRecord(1, 1, 2, 5.0), SpendingRecord(3, 1, 3, 1.25)]
+    assert repository.list_spendings(1) == []
+    assert repository.list_spendings(2) == [SpendingRecord(2, 2, 1, 7.5)]
+    assert repository.delete_spendings(1) == []
+
+
+def test_matrix_shape_after_deletes(repository):
+    assert repository.matrix_shape() == (0, 0)
+
+    repository.add_spending(1, 1, 1.0)
+    repository.add_spending(1, 2, 1.0)
+    repository.add_spending(2, 2, 1.0)
+    repository.add_spending(3, 3, 1.0)
+    assert repository.matrix_shape() == (3, 3)
+
+    repository.delete_spendings(3)
+    assert repository.matrix_shape() == (2, 2)
+
+    repository.delete_spendings(1)
+    assert repository.matrix_shape() == (1, 1)
+
+
+def test_top_merchant_most_frequent(repository):
+    repository.add_spending(1, 1, 1.0)
+    repository.add_spending(1, 2, 1.0)
+    repository.add_spending(1, 2, 1.0)
+    assert repository.top_merchant(1) == 2
+
+
+def test_top_merchant_tie_goes_to_lowest_merchant_id(repository):
+    for merchant_id in (3, 1, 2, 3, 1, 2):
+        repository.add_spending(1, merchant_id, 1.0)
+    assert repository.top_merchant(1) == 1
+
+
+def test_top_merchant_unknown_user_is_none(repository):
+    repository.add_spending(1, 1, 1.0)
+    assert repository.top_merchant(2) is None
+
+
+def test_top_merchant_after_delete_is_none(repository):
+    repository.add_spending(1, 1, 1.0)
+    repository.delete_spendings(1)
+    assert repository.top_merchant(1) is None
+
+
+def test_in_memory_compaction_keeps_live_rows(monkeypatch):
+    monkeypatch.setattr(data.repository, "COMPACT_MIN_DEAD_ROWS", 4)
+    repository = InMemorySpendingRepository()
+
+    repository.add_spending(2, 7, 2.0)
+    for _ in range(3):
+        for merchant_id in range(5):
+            repository.add_spending(1, merchant_id, 1.0)
+        repository.delete_spendings(1)
+    repository.add_spending(2, 8, 3.0)
+
+    # Dead rows were dropped from the columns
+    assert len(repository._transaction_ids) < 10
+    assert repository.list_spendings(2) == [
+        SpendingRecord(1, 2, 7, 2.0),
+        SpendingRecord(17, 2, 8, 3.0),
+    ]
+    assert repository.matrix_shape() == (1, 2)
+    assert repository.add_spending(1, 1, 1.0) == 18
+    assert repository.top_merchant(1) == 1
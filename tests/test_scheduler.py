@@ -0,0 +1,138 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from services.scheduler import MATRIX_KEY, PrecomputeScheduler, recommendation_key
+
+
+class FakeRepository:
+    def __init__(self):
+        self.during_compute = None
+        self.computes = 0
+
+    def matrix_shape(self):
+        self.computes += 1
+        if self.during_compute:
+            self.during_compute()
+        return (1, 1)
+
+    def top_merchant(self, user_id):
+        self.computes += 1
+        return None
+
+
+def make_scheduler(repository, interval=60.0, max_staleness=5.0, cache_size=100):
+    @contextmanager
+    def open_repository():
+        yield repository
+
+    return PrecomputeScheduler(
+        open_repository, interval=interval, max_staleness=max_staleness, cache_size=cache_size
+    )
+
+
+def test_fresh_result_is_served_from_cache():
+    repository = FakeRepository()
+    scheduler = make_scheduler(repository)
+
+    assert scheduler.matrix_shape() == ((1, 1), True)
+    assert scheduler.matrix_shape() == ((1, 1), True)
+    assert repository.computes == 1
+
+
+def test_stale_result_is_flagged_not_fresh():
+    repository = FakeRepository()
+    scheduler = make_scheduler(repository)
+    scheduler.matrix_shape()
+    scheduler.start()
+    try:
+        scheduler.mark_dirty(1)
+
+        assert scheduler.matrix_shape() == ((1, 1), False)
+        assert repository.computes == 1
+    finally:
+        scheduler.stop()
+
+
+def test_stale_result_is_recomputed_when_not_running():
+    # PRECOMPUTE_ENABLED=false: nothing would ever refresh a stale result
+    repository = FakeRepository()
+    scheduler = make_scheduler(repository)
+    scheduler.matrix_shape()
+
+    scheduler.mark_dirty(1)
+
+    assert scheduler.matrix_shape() == ((1, 1), True)
+    assert repository.computes == 2
+    assert scheduler.stats()["stale_results"] == 1  # the recommendation was never read
+
+
+def test_write_during_compute_restarts_staleness():
+    repository = FakeRepository()
+    scheduler = make_scheduler(repository)
+    scheduler.mark_dirty(1)
+    dirty_before = scheduler._dirty_since[MATRIX_KEY]
+
+    repository.during_compute = lambda: scheduler.mark_dirty(2)
+    scheduler.matrix_shape()
+
+    # Still dirty (a write landed during the compute), but not since the old change
+    assert scheduler._dirty_since[MATRIX_KEY] > dirty_before
+
+
+def test_unknown_users_are_not_cached():
+    scheduler = make_scheduler(FakeRepository())
+
+    for user_id in range(50):
+        assert scheduler.recommendation(user_id) == (None, True)
+
+    assert recommendation_key(0) not in scheduler._results
+
+
+def test_cache_is_bounded_and_keeps_matrix():
+    scheduler = make_scheduler(FakeRepository(), cache_size=3)
+    scheduler.matrix_shape()
+
+    for user_id in range(10):
+        scheduler.mark_dirty(user_id)
+        scheduler.recommendation(user_id)
+
+    assert len(scheduler._results) == 3
+    assert MATRIX_KEY in scheduler._results
+    assert recommendation_key(9) in scheduler._results
+
+
+def test_worker_drains_backlog():
+    repository = FakeRepository()
+    scheduler = make_scheduler(repository, interval=0.01)
+    scheduler.matrix_shape()
+    computing, release = threading.Event(), threading.Event()
+
+    def block():
+        computing.set()
+        release.wait(5)
+
+    repository.during_compute = block
+    scheduler.start()
+    try:
+        scheduler.mark_dirty(1)
+        assert computing.wait(5)
+        assert scheduler.stats()["backlog"] >= 1
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while scheduler.stats()["backlog"] or scheduler.stats()["stale_results"]:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        stats = scheduler.stats()
+        assert stats["running"]
+        assert stats["processed"] == 2
+        assert stats["errors"] == 0
+        assert scheduler.matrix_shape() == ((1, 1), True)
+        assert scheduler.recommendation(1) == (None, True)
+    finally:
+        release.set()
+        scheduler.stop()
+
+    assert not scheduler.running
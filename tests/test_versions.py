@@ -0,0 +1,133 @@
+from contextlib import contextmanager
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from config.settings import get_settings
+from data import db
+from data.repository import InMemorySpendingRepository
+from data.versions import DataVersions, data_versions, etag_matches
+from routers import matrix_router, recommendation_router, spending_router
+
+ETAG = 'W/"abc-u1-2"'
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected",
+    [
+        (None, False),
+        ("", False),
+        ("*", True),
+        ('W/"abc-u1-2"', True),
+        ('"abc-u1-2"', True),
+        ('"other", W/"abc-u1-2"', True),
+        ('W/"abc-u1-1"', False),
+        ('"abc-u1-2-x"', False),
+    ],
+)
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches(if_none_match, ETAG) is expected
+
+
+def test_bump_changes_user_and_global_etags():
+    versions = DataVersions()
+    user_1, user_2, everything = (
+        versions.user_etag(1), versions.user_etag(2), versions.global_etag()
+    )
+
+    versions.bump(1)
+
+    assert versions.user_etag(1) != user_1
+    assert versions.user_etag(2) == user_2
+    assert versions.global_etag() != everything
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Real routers on a fresh memory:// store. The worker runs but never wakes
+    # up during a test, so results only go stale, they are never refreshed.
+    monkeypatch.setenv("DATABASE_URL", "memory://")
+    monkeypatch.setenv("PRECOMPUTE_INTERVAL", "60")
+    monkeypatch.setenv("ETAG_CACHING", "true")
+    get_settings.cache_clear()
+    monkeypatch.setattr(db, "_memory_repository", InMemorySpendingRepository())
+
+    app = FastAPI(lifespan=db.lifespan)
+    app.include_router(spending_router)
+    app.include_router(matrix_router)
+    app.include_router(recommendation_router)
+    with TestClient(app) as client:
+        client.post("/spendings", json={"user_id": 1, "merchant_id": 2, "amount": 9.5})
+        yield client
+    get_settings.cache_clear()
+
+
+def forbid_repository(client):
+    '''
+    Makes any repository access fail, to prove a 304 never reaches it
+    '''
+    def fail():
+        raise AssertionError("repository opened")
+        yield
+
+    client.app.dependency_overrides[db.get_repository] = fail
+    client.app.state.scheduler.open_repository = contextmanager(fail)
+
+
+@pytest.mark.parametrize("path", ["/spendings/1", "/recommendations/1", "/matrix_properties"])
+def test_matching_etag_gets_304_without_repository(client, path):
+    response = client.get(path)
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    forbid_repository(client)
+    response = client.get(path, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_spendings_etag_changes_after_post_and_delete(client):
+    before = client.get("/spendings/1").headers["ETag"]
+
+    client.post("/spendings", json={"user_id": 1, "merchant_id": 3, "amount": 1.0})
+    after_post = client.get("/spendings/1", headers={"If-None-Match": before})
+    client.delete("/spendings/1")
+    after_delete = client.get("/spendings/1", headers={"If-None-Match": after_post.headers["ETag"]})
+
+    assert after_post.status_code == after_delete.status_code == 200
+    assert len(after_post.json()) == 2
+    assert after_delete.json() == []
+    assert len({before, after_post.headers["ETag"], after_delete.headers["ETag"]}) == 3
+
+
+@pytest.mark.parametrize("path", ["/recommendations/1", "/matrix_properties"])
+def test_precomputed_etag_is_invalidated_by_post_and_delete(client, path):
+    before_post = client.get(path).headers["ETag"]
+    client.post("/spendings", json={"user_id": 1, "merchant_id": 3, "amount": 1.0})
+    assert client.get(path, headers={"If-None-Match": before_post}).status_code == 200
+
+    if path.startswith("/recommendations"):
+        before_delete = data_versions.user_etag(1)
+    else:
+        before_delete = data_versions.global_etag()
+    client.delete("/spendings/1")
+    assert client.get(path, headers={"If-None-Match": before_delete}).status_code == 200
+
+
+def test_stale_result_is_sent_without_etag(client):
+    first = client.get("/recommendations/1")
+    assert first.json()["recommended_merchant_id"] == 2
+    assert "ETag" in first.headers
+
+    for _ in range(2):
+        client.post("/spendings", json={"user_id": 1, "merchant_id": 5, "amount": 1.0})
+    stale = client.get("/recommendations/1", headers={"If-None-Match": first.headers["ETag"]})
+
+    # The scheduler still serves the old value (fresh=False): no ETag may
+    # label it, or the client would cache it under the new version
+    assert stale.status_code == 200
+    assert stale.json()["recommended_merchant_id"] == 2
+    assert "ETag" not in stale.headers